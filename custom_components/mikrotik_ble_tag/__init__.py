@@ -1,12 +1,21 @@
 import logging
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_MAC, CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from .const import DOMAIN
+from .coordinator import MikroTikBLETagCoordinator
+from .util import normalize_mac
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MikroTik BLE Tag from a config entry."""
+    # Subscribe once to advertisements shared by all sensors of this tag
+    coordinator = MikroTikBLETagCoordinator(hass, entry.data[CONF_NAME], entry.data[CONF_MAC])
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_start())
+
     # Forward the setup to the sensor platform
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
@@ -14,5 +23,36 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Forward the unload to the sensor platform
-    await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id)
+    return unload_ok
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version == 1:
+        # Version 1 stored the MAC as typed; the bluetooth integration matches AA:BB:CC:DD:EE:FF
+        old_mac = entry.data[CONF_MAC]
+        new_mac = normalize_mac(old_mac)
+
+        if new_mac != old_mac:
+            # Keep the existing device and entities under the normalized address
+            device_registry = dr.async_get(hass)
+            device = device_registry.async_get_device(identifiers={(DOMAIN, old_mac)})
+            if device is not None:
+                device_registry.async_update_device(device.id, new_identifiers={(DOMAIN, new_mac)})
+
+            @callback
+            def migrate_unique_id(entity_entry):
+                """Move an entity unique ID to the normalized address."""
+                prefix = f"{old_mac}_"
+                if not entity_entry.unique_id.startswith(prefix):
+                    return None
+                return {"new_unique_id": f"{new_mac}_{entity_entry.unique_id[len(prefix):]}"}
+
+            await er.async_migrate_entries(hass, entry.entry_id, migrate_unique_id)
+
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_MAC: new_mac}, version=2)
+        _LOGGER.debug("Migrated config entry %s to version 2", entry.entry_id)
+
     return True
@@ -1,12 +1,17 @@
 import logging
+import re
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 from .const import DOMAIN
+from .util import normalize_mac
 
 _LOGGER = logging.getLogger(__name__)
 
+# Six hex octets, optionally separated by ":" or "-"
+_MAC_RE = re.compile(r"([0-9A-Fa-f]{2}[:-]?){5}[0-9A-Fa-f]{2}")
+
 DATA_SCHEMA = vol.Schema({
     vol.Required("name"): str,
     vol.Required("mac"): str,
@@ -15,7 +20,7 @@ DATA_SCHEMA = vol.Schema({
 class MikroTikBLETagConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for MikroTik BLE Tag."""
 
-    VERSION = 1
+    VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
     async def async_step_user(self, user_input=None):
@@ -24,17 +29,22 @@ class MikroTikBLETagConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             # Validate the MAC address
-            mac = user_input["mac"].replace(":", "").upper()
-            if len(mac) != 12 or not mac.isalnum():
+            if not _MAC_RE.fullmatch(user_input["mac"]):
                 errors["mac"] = "invalid_mac"
             else:
+                address = normalize_mac(user_input["mac"])
+
                 # Check if the device is already configured
-                await self.async_set_unique_id(mac)
+                await self.async_set_unique_id(address.replace(":", ""))
                 self._abort_if_unique_id_configured()
 
+                # Store the address in the AA:BB:CC:DD:EE:FF form used by the bluetooth integration
                 return self.async_create_entry(
                     title=user_input["name"],
-                    data=user_input,
+                    data={
+                        "name": user_input["name"],
+                        "mac": address,
+                    },
                 )
 
         return self.async_show_form(
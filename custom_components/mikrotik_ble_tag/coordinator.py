@@ -0,0 +1,119 @@
+import logging
+from collections.abc import Mapping
+from types import MappingProxyType
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothScanningMode,
+    async_register_callback,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from .const import DOMAIN
+from .parser import parse_mikrotik_payload
+
+_LOGGER = logging.getLogger(__name__)
+
+# MikroTik manufacturer ID
+MIKROTIK_MANUFACTURER_ID = 0x094F
+
+# Shared read-only result for payloads that cannot be parsed
+_EMPTY: Mapping[str, object] = MappingProxyType({})
+
+class MikroTikBLETagCoordinator:
+    """Receive advertisements for a MikroTik BLE Tag and share parsed data with its sensors."""
+
+    def __init__(self, hass: HomeAssistant, name, mac):
+        """Initialize the coordinator."""
+        self.hass = hass
+        self._mac = mac
+        # Device registry entry, built once per config entry
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, mac)},  # Unique identifier for the device
+            name=name,  # Name of the device
+            manufacturer="MikroTik",
+            model="BLE Tag",
+        )
+        self.values = {}  # Latest parsed attributes
+        self._listeners = set()  # Entity update callbacks
+
+    def async_add_listener(self, update_callback):
+        """Register a callback to run whenever new data is parsed and return a function to remove it."""
+        self._listeners.add(update_callback)
+
+        def remove_listener():
+            self._listeners.discard(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_start(self):
+        """Subscribe to advertisements from the tag and return a function to unsubscribe."""
+        # The bluetooth integration owns the shared scanner and only dispatches matching adverts
+        return async_register_callback(
+            self.hass,
+            self._async_on_advertisement,
+            BluetoothCallbackMatcher(
+                address=self._mac,  # Normalized by the config flow or entry migration
+                manufacturer_id=MIKROTIK_MANUFACTURER_ID,
+                connectable=False,
+            ),
+            BluetoothScanningMode.PASSIVE,
+        )
+
+    @callback
+    def _async_on_advertisement(self, service_info, change):
+        """Callback for when an advertisement from the tag is received."""
+        self._process_advertisement_data(service_info)
+
+    def _process_advertisement_data(self, service_info):
+        """Parse advertisement data once and notify all listening sensors."""
+        # Errors are not caught here; the bluetooth integration logs them with a traceback
+        data = service_info.manufacturer_data.get(MIKROTIK_MANUFACTURER_ID)
+        if data is None:
+            return
+
+        attributes = self.parse_mikrotik_data(data)
+        if attributes is _EMPTY:
+            return  # Keep the last good values on malformed payloads
+        attributes["rssi"] = service_info.rssi  # Use rssi from the service info
+        if attributes == self.values:
+            return  # Nothing changed since the last advertisement
+        self.values = attributes
+
+        # Notify the sensors of the state update
+        for update_callback in self._listeners:
+            update_callback()
+
+    def parse_mikrotik_data(self, data):
+        """Parse MikroTik BLE Tag data from advertisement packets."""
+        # Log the raw data for debugging
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Raw advertisement data (hex): %s", data.hex())
+            _LOGGER.debug("Raw advertisement data (length): %d bytes", len(data))
+
+        parsed = parse_mikrotik_payload(bytes(data))
+        if parsed is None:
+            return _EMPTY
+
+        (
+            acc_x,
+            acc_y,
+            acc_z,
+            total_acceleration,
+            temperature,
+            uptime,
+            flag,
+            battery,
+        ) = parsed
+
+        # Return parsed attributes
+        return {
+            "acceleration_x": acc_x,
+            "acceleration_y": acc_y,
+            "acceleration_z": acc_z,
+            "total_acceleration": total_acceleration,
+            "temperature": temperature,
+            "uptime": uptime,
+            "flags": flag,
+            "battery": battery,
+        }
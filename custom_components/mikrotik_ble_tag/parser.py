@@ -0,0 +1,110 @@
+import logging
+import struct
+import math
+from functools import lru_cache
+from types import MappingProxyType
+
+_LOGGER = logging.getLogger(__name__)
+
+# Flag bit masks
+FLAG_REED_SWITCH = 0x01  # 1st bit
+FLAG_ACCEL_TILT = 0x02    # 2nd bit
+FLAG_ACCEL_FREE_FALL = 0x04  # 3rd bit
+FLAG_IMPACT_X = 0x08      # 4th bit
+FLAG_IMPACT_Y = 0x10      # 5th bit
+FLAG_IMPACT_Z = 0x20      # 6th bit
+
+# Read-only flag attributes for every combination of the six flag bits
+_FLAG_NAMES = (
+    ("flag_reed_switch", FLAG_REED_SWITCH),
+    ("flag_accel_tilt", FLAG_ACCEL_TILT),
+    ("flag_accel_free_fall", FLAG_ACCEL_FREE_FALL),
+    ("flag_impact_x", FLAG_IMPACT_X),
+    ("flag_impact_y", FLAG_IMPACT_Y),
+    ("flag_impact_z", FLAG_IMPACT_Z),
+)
+FLAG_TABLE = tuple(
+    MappingProxyType({name: bool(i & mask) for name, mask in _FLAG_NAMES}) for i in range(0x40)
+)
+
+# Precompiled layout of the 18-byte MikroTik payload, little-endian throughout
+_MT_STRUCT = struct.Struct('<BBHhhhhIBB')
+_PAYLOAD_SIZE = _MT_STRUCT.size
+
+def _triple_accel(x_raw, y_raw, z_raw):
+    """Convert raw 8.8 fixed-point acceleration to X/Y/Z and total acceleration in m/s²."""
+    # Clamp to the typical range of acceleration sensors
+    x = max(-16.0, min(16.0, x_raw / 256.0))
+    y = max(-16.0, min(16.0, y_raw / 256.0))
+    z = max(-16.0, min(16.0, z_raw / 256.0))
+    return x, y, z, math.hypot(x, y, z)
+
+def _convert_temperature(value):
+    """Convert temperature from signed 16-bit integer 8.8 fixed-point format to Celsius."""
+    temperature_celsius = value / 256.0
+    # Ignore invalid temperature values (outside reasonable range)
+    if temperature_celsius < -50 or temperature_celsius > 100:
+        return None
+    return temperature_celsius
+
+def _convert_battery(value):
+    """Convert battery value to percentage."""
+    # Clamp battery value to valid range (0-100)
+    if value < 0 or value > 100:
+        return None
+    return value
+
+@lru_cache(maxsize=256)
+def parse_mikrotik_payload(data: bytes):
+    """Parse a MikroTik payload into an immutable tuple, caching repeated advertisements."""
+    # Ensure the data holds at least the 18-byte payload
+    if len(data) < _PAYLOAD_SIZE:
+        _LOGGER.error("Invalid data length: expected %d bytes, got %d bytes", _PAYLOAD_SIZE, len(data))
+        return None
+
+    # Unpack the 18 bytes of data
+    (
+        payload_version,  # 1 byte
+        encryption_flag,  # 1 byte
+        salt,             # 2 bytes
+        acc_x_raw,        # 2 bytes (signed 8.8 fixed-point)
+        acc_y_raw,        # 2 bytes (signed 8.8 fixed-point)
+        acc_z_raw,        # 2 bytes (signed 8.8 fixed-point)
+        temperature_raw,  # 2 bytes (signed 8.8 fixed-point)
+        uptime,           # 4 bytes
+        flag,             # 1 byte
+        battery,          # 1 byte
+    ) = _MT_STRUCT.unpack_from(data)
+
+    # Convert acceleration values and total acceleration in one step
+    acc_x_converted, acc_y_converted, acc_z_converted, total_acceleration = _triple_accel(
+        acc_x_raw, acc_y_raw, acc_z_raw
+    )
+
+    # Convert temperature and ignore invalid values
+    temperature_converted = _convert_temperature(temperature_raw)
+
+    # Convert battery value and ignore invalid values
+    battery_converted = _convert_battery(battery)
+
+    # Log the parsed values for debugging
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(
+            "Parsed values: payload_version=%s, encryption_flag=%s, salt=%s, "
+            "acc_x=%s, acc_y=%s, acc_z=%s, temperature=%s, "
+            "uptime=%s, flag=%s, battery=%s, flags=%s",
+            payload_version, encryption_flag, salt,
+            acc_x_converted, acc_y_converted, acc_z_converted, temperature_converted,
+            uptime, flag, battery_converted, FLAG_TABLE[flag & 0x3F],
+        )
+
+    return (
+        acc_x_converted,
+        acc_y_converted,
+        acc_z_converted,
+        total_acceleration,
+        temperature_converted,
+        uptime,  # Raw seconds, formatted by the uptime sensor
+        flag,
+        battery_converted,
+    )
@@ -0,0 +1,4 @@
+def normalize_mac(mac):
+    """Return a MAC address in the AA:BB:CC:DD:EE:FF form used by the bluetooth integration."""
+    mac = mac.replace(":", "").replace("-", "").upper()
+    return ":".join(mac[i:i + 2] for i in range(0, len(mac), 2))